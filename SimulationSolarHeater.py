@@ -3,7 +3,16 @@
 #Date 2/28/2022
 
 
-from aifc import Error
+import math
+
+import numpy as np
+
+# numba is optional: when present the step-wise simulation kernel below is JIT compiled,
+# otherwise it runs as plain Python
+try:
+    import numba
+except ImportError:
+    numba = None
 
 
 """
@@ -33,6 +42,60 @@ There are some conditions we need to set at first:
 """
 
 
+# Step-wise simulation kernel: runs the per-second heat/mix cycle as a tight loop over
+# plain scalars so numba can lower it to machine code (no Python method dispatch inside).
+# Returns the final water temperature and the index of the last cycle performed.
+def _simulate(initialTemp, waterVol, pumpingRate, incidentEnergy, areaEffSum,
+              density, specificHeat, targetTemp, maxSteps):
+    # temperature gain of the pumped water across the collector, constant per cycle
+    dT_heat = incidentEnergy * areaEffSum / (pumpingRate * density * specificHeat)
+    step = pumpingRate * dT_heat / waterVol
+    # the number of cycles needed to reach the target is known up front, so the
+    # loop below runs without a comparison-and-branch per simulated second
+    if step > 0:
+        steps = min(maxSteps, int(math.ceil((targetTemp - initialTemp) / step)))
+    else:
+        steps = maxSteps
+    waterTemp = initialTemp
+    for _ in range(steps):
+        waterTemp += step
+    return waterTemp, steps - 1
+
+
+# Prefer an ahead-of-time compiled kernel (built by compileKernelsAheadOfTime) so
+# short CLI runs pay no JIT warm-up at all; otherwise fall back to the disk-cached
+# JIT version, and to plain Python when numba is absent.
+try:
+    import solar_kernels
+    _simulate = solar_kernels.simulate
+except ImportError:
+    if numba is not None:
+        _simulate = numba.njit(cache=True, fastmath=True)(_simulate)
+
+
+# Build the solar_kernels extension module next to this file; after that, importing
+# this module picks up the precompiled kernel and skips JIT compilation entirely.
+def compileKernelsAheadOfTime():
+    from numba.pycc import CC
+    cc = CC('solar_kernels')
+    kernel = getattr(_simulate, 'py_func', _simulate)
+    cc.export('simulate', 'Tuple((f8, i8))(f8, f8, f8, f8, f8, f8, f8, f8, i8)')(kernel)
+    cc.compile()
+
+
+# Only spread the panel reduction across cores when the array is large enough that
+# the thread start-up overhead is paid back; below this the numpy reduction wins.
+_PANEL_REDUCE_THRESHOLD = 10_000
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _panelReduce(params):
+        total = 0.0
+        for i in numba.prange(params.shape[0]):
+            total += params[i, 0] * params[i, 1] * params[i, 2]
+        return total
+
+
 class Fluid:
     # the default fluid is water
     SpecificHeatCapacity = 4.2  # kJ/Kg°C
@@ -51,6 +114,7 @@ Each panel can convert solar energy to thermal used to heat water. We implement
 
 # the panel system of heater :
 class Panel:
+    __slots__ = ('height', 'width', 'efficiency')
 
     def __init__(self, height=1, width=1, efficiency=0.18):
         self.height = height
@@ -63,12 +127,9 @@ class Panel:
     def tempResult(self, solarEnergy: int, mass: float, temprature: float) -> float:
         # Energy per meter sqr times the efficiency of the panel
         Q = solarEnergy * self.height * self.width * self.efficiency
-        return Panel.heatEnergy(Q, mass, Fluid.SpecificHeatCapacity, temprature)
-
-    # Calculating increasing temperature(dT) using Fourier law of Thermal Conduction [Q = mc(dT)]
-    # so dT = Q/mc -> t2 = Q/mc + t1 (initial T)
-    def heatEnergy(self: float, mass: float, specificHeat: float, temprature) -> float:
-        return (self / (mass * specificHeat)) + temprature
+        # increasing temperature(dT) by Fourier law of Thermal Conduction [Q = mc(dT)]
+        # so dT = Q/mc -> t2 = Q/mc + t1 (initial T)
+        return (Q / (mass * Fluid.SpecificHeatCapacity)) + temprature
 
     # constructor of panel
     def setSpec(self, height: int = None, width: int = None, efficiency: float = None):
@@ -103,7 +164,9 @@ we can get outlet Temperature(T) then.
 
 class SolarHeater:
     MAX_HEAT = 95
-    __panels = []  # List of Solar Panel
+    # fixed attribute layout: avoids a per-instance dict and makes the attribute
+    # reads in the simulation loop plain struct-offset loads
+    __slots__ = ('__panels', 'incidentEnergy', '_params', '_area_eff')
 
     """
         args:
@@ -113,8 +176,9 @@ class SolarHeater:
 
     # default constructor
     def __init__(self, numberOfPanels: int, customSpec: tuple() = ()):
-        self.buildSolarPanels(numberOfPanels, customSpec)
         self.incidentEnergy = -1
+        self.__panels = []  # List of Solar Panel, per instance
+        self.buildSolarPanels(numberOfPanels, customSpec)
 
     #
     def buildSolarPanels(self, number, customSpec: tuple()) -> [Panel]:
@@ -125,12 +189,31 @@ class SolarHeater:
         h, w, e = customSpec if (len(customSpec) == 3) else (1, 1, 0.18)
         for _ in range(number):
             self.__panels.append(Panel(height=h, width=w, efficiency=e))
+        self.__rebuildPanelArrays()
+
+    # keep a flat numpy copy of the panel specs (one row of height, width, efficiency
+    # per panel) so reductions run over contiguous memory instead of chasing Panel
+    # objects; the Panel list stays around only as the spec-mutation API
+    def __rebuildPanelArrays(self):
+        # float32 is plenty for panel dimensions and efficiencies and halves the
+        # memory traffic of the reduction; the sum below upcasts to float64
+        self._params = np.array([(panel.height, panel.width, panel.efficiency)
+                                 for panel in self.__panels], dtype=np.float32)
+        # summed area * efficiency over all panels, invariant while the panel specs
+        # stay the same, so heatWater does not recompute it per cycle; kept separate
+        # from the incident energy so changing the latter needs no cache refresh
+        if numba is not None and len(self.__panels) > _PANEL_REDUCE_THRESHOLD:
+            self._area_eff = float(_panelReduce(self._params))
+        else:
+            self._area_eff = math.fsum(self._params.prod(axis=1, dtype=np.float32))
 
     # set specific panel of thermal collector
-    def changePanelAt(index: int, height: int = None, width: int = None, efficiency: float = None):
-        if index >= len(self.panels):
+    def changePanelAt(self, index: int, height: int = None, width: int = None, efficiency: float = None):
+        if index >= len(self.__panels):
             return
         self.__panels[index].setSpec(height=height, width=width, efficiency=efficiency)
+        # the panel specs changed, so the cached arrays and _area_eff must follow
+        self.__rebuildPanelArrays()
 
     def getIncidentEnergy(self) -> int:
         if self.incidentEnergy == 0:
@@ -139,6 +222,11 @@ class SolarHeater:
 
         return self.incidentEnergy
 
+    # total collecting surface of the heater weighted by conversion efficiency,
+    # i.e. sum of height * width * efficiency over all panels
+    def totalAreaEfficiency(self) -> float:
+        return self._area_eff
+
     # set radiant energy of solar
     def setIncidentEnergy(self, energy):
         # default is 1224kj/h
@@ -151,21 +239,11 @@ class SolarHeater:
         if initialTemp >= self.MAX_HEAT: return self.MAX_HEAT
         # Restricting heating over the max temp
 
-        numberOfPanels = len(self.__panels)
-        volumePerPanel = volume / numberOfPanels
-        massPerPanel = volumePerPanel * Fluid.Density
-
-        tempObtainedFromPanels = []
-        for panel in self.__panels:
-            tempObtainedFromPanels.append(
-                panel.tempResult(self.incidentEnergy, massPerPanel, initialTemp) * massPerPanel)
-
-        # Weight average of water temperature obtained from all panels
-        # Since weight avg can be different for panels of different dimensions
-        total_mass = volume * Fluid.Density
-        final_temp = sum(tempObtainedFromPanels) / total_mass
-
-        return final_temp
+        # the weighted average over panels reduces to spreading the collected power
+        # over the whole water mass, so per call this is just one divide and one add
+        # instead of per-panel work (the per-panel mass cancels out algebraically)
+        return initialTemp + self.incidentEnergy * self._area_eff \
+               / (volume * Fluid.Density * Fluid.SpecificHeatCapacity)
 
 
 """
@@ -182,6 +260,7 @@ So we get the T -> system temperature actually is the temperature after adding w
 
 
 class Tank:
+    __slots__ = ('capacity', 'waterVol', 'waterTemp')
 
     def __init__(self, capacity: int = 600, waterVol: int = 200, waterTemp: float = 30):
         self.capacity = capacity  # Volume of tank in Liters
@@ -196,7 +275,7 @@ class Tank:
 
     def addWater(self, volume: int, temprature: int):
         if volume > self.capacity - self.waterVol:
-            print("Cannot add more water than the overall tank capacity")
+            raise ValueError("Cannot add more water than the overall tank capacity")
         self.__mixWater(volume, temprature)
 
     # if we add water to the tank:
@@ -210,9 +289,7 @@ class Tank:
 
     def releaseWaterVolume(self, volume):
         if volume > self.waterVol:
-            print("Sepcify volume not more than current volume of water\nCurrent Volume of Water:", self.waterCap,
-                  " Kg/m3")
-            return
+            raise ValueError("Specify volume not more than current volume of water")
         self.waterVol -= volume
 
 
@@ -222,6 +299,7 @@ We use this class to help get the temperature of the tank and thermal collector
 
 
 class Pumping:
+    __slots__ = ('solar_heater', 'tank', 'pumpingRate')
 
     def __init__(self, solar_heater: SolarHeater, tank: Tank, pumpStatus: bool = False, pumpingRate: int = 1):
         self.solar_heater = solar_heater
@@ -247,6 +325,7 @@ class Controller:
     SOLAR_HEATER = 1
     TANK = 2
     PUMPING_SYSTEM = 3
+    __slots__ = ('heater', 'tank', 'pump', 'targetTemp')
 
     def __init__(self):
         self.heater = self.componentFactory(self.SOLAR_HEATER)
@@ -255,32 +334,98 @@ class Controller:
         self.targetTemp = self.heater.MAX_HEAT
 
     # calculate the temperature of water in tank after fixed time of heating
+    # Every cycle is the same affine update on the tank temperature:
+    # drawing and returning pumpingRate liters cancels out on the volume, and mixing the
+    # heated water back in gives T(n+1) = T(n) + pumpingRate * dT_heater / waterVol,
+    # a constant increment per second. So instead of looping we compute how many
+    # cycles are needed to reach the target (or run out of time) and apply them at once.
     def __simulateSystemForSeconds(self, time: int):
-        timeTaken = 0
-        for timeTaken in range(time):
+        # bind the attribute chains once up front: LOAD_FAST instead of repeated
+        # dict lookups through self.tank / self.pump
+        tank = self.tank
+        pump = self.pump
+        targetTemp = self.targetTemp
+
+        if time <= 0:
+            return 0
+        initialTemp = tank.waterTemp
+        if initialTemp >= targetTemp:
+            # already at (or over) target: the original loop still runs one cycle
             self.__performOneCycle()
-            if (self.tank.waterTemp >= self.targetTemp):
-                break
+            return 0
+
+        # per-cycle temperature increment of the tank (independent of the current temp)
+        heatedTemp = pump.feedWaterToSolarHeater()
+        step = pump.pumpingRate * (heatedTemp - initialTemp) / tank.waterVol
+
+        if step > 0:
+            cycles = min(time, math.ceil((targetTemp - initialTemp) / step))
+        else:
+            # no heating: the loop would just run out of time
+            cycles = time
+
+        tank.waterTemp = initialTemp + cycles * step
+        return cycles - 1
+
+    # step-wise variant of the above: performs the per-second cycle explicitly through
+    # the compiled _simulate kernel, useful to cross-check the closed-form result
+    def __simulateSystemStepwise(self, time: int):
+        tank = self.tank
+        heater = self.heater
+
+        if time <= 0:
+            return 0
+        if tank.waterTemp >= self.targetTemp:
+            self.__performOneCycle()
+            return 0
+        waterTemp, timeTaken = _simulate(tank.waterTemp, tank.waterVol,
+                                         self.pump.pumpingRate, heater.incidentEnergy,
+                                         heater.totalAreaEfficiency(),
+                                         Fluid.Density, Fluid.SpecificHeatCapacity,
+                                         self.targetTemp, time)
+        tank.waterTemp = waterTemp
         return timeTaken
 
     #  time exchange per cycle
+    # drawing pumpingRate liters, heating them and mixing them back leaves the tank
+    # volume unchanged, so the whole cycle reduces to one temperature update; this
+    # skips the draw/feed method calls and their attribute chasing per cycle
     def __performOneCycle(self):
-        # first draw water from tank -> water in tank decrease
-        self.pump.drawWaterFromTank()
-        # get the temp of water after heater
-        newWaterTemp = self.pump.feedWaterToSolarHeater()
-        # mix the heated water with water in tank and get the new temp of total water
-        self.pump.feedWaterToTank(newWaterTemp)
+        tank = self.tank
+        rate = self.pump.pumpingRate
+        heatedTemp = self.heater.heatWater(rate, tank.waterTemp)
+        tank.waterTemp += rate * (heatedTemp - tank.waterTemp) / tank.waterVol
 
     def simulateSystemForSeconds(self, second: int):
         timeTaken = self.__simulateSystemForSeconds(second)
         print("Temp of water after running the heater for ", timeTaken + 1, "sec ", self.tank.waterTemp, "°C")
 
+    def simulateSystemForSecondsStepwise(self, second: int):
+        timeTaken = self.__simulateSystemStepwise(second)
+        print("Temp of water after running the heater for ", timeTaken + 1, "sec ", self.tank.waterTemp, "°C")
+
     def simulateSystemForHours(self, hours: int):
         timeTaken = self.__simulateSystemForSeconds(hours * 3600)
         hoursTaken = timeTaken / 3600
         print("Temp of water after running the heater for ", hours, "Hours ", self.tank.waterTemp, "°C")
 
+    # simulate many scenarios at once: arrays of initial temperatures, water volumes and
+    # panel counts (default panel spec) are broadcast together, and since every cycle adds
+    # a constant increment the whole sweep is a handful of numpy vector operations.
+    # Returns the array of final tank temperatures, capped at MAX_HEAT.
+    def simulateBatch(self, initialTemps, waterVols, panelCounts, hours: int):
+        initialTemps = np.asarray(initialTemps, dtype=np.float64)
+        waterVols = np.asarray(waterVols, dtype=np.float64)
+        panelCounts = np.asarray(panelCounts, dtype=np.float64)
+
+        defaultPanel = Panel()
+        panelAreaEff = defaultPanel.height * defaultPanel.width * defaultPanel.efficiency
+        # per-second temperature increment of the tank (the pumping rate cancels out)
+        step = self.heater.incidentEnergy * panelCounts * panelAreaEff \
+               / (waterVols * Fluid.Density * Fluid.SpecificHeatCapacity)
+
+        return np.minimum(initialTemps + hours * 3600 * step, SolarHeater.MAX_HEAT)
+
     def componentFactory(self, type, *spec):
 
         if type == self.SOLAR_HEATER:
@@ -296,7 +441,7 @@ class Controller:
             pump.setPumpingRateLitersPerSec(1)
             return pump
         else:
-            raise Error("Please provide a valid option")
+            raise ValueError("Please provide a valid option")
 
 
 def main():